@@ -1,13 +1,25 @@
 """kvartac integration."""
+import contextlib
+import cProfile
+import json
 import logging
+import os
+import pstats
+import time
+from datetime import date, datetime
 
-from typing import Final
+from typing import Any, Final
+import aiohttp
 import async_timeout
+import voluptuous as vol
 
-from homeassistant.core import HomeAssistant
-from homeassistant.helpers.aiohttp_client import async_get_clientsession
+from homeassistant.core import HomeAssistant, ServiceCall, callback
+from homeassistant.helpers.aiohttp_client import (
+    async_create_clientsession,
+    async_get_clientsession,
+)
 from homeassistant.config_entries import ConfigEntry
-from homeassistant.exceptions import ConfigEntryAuthFailed
+from homeassistant.exceptions import ConfigEntryAuthFailed, HomeAssistantError
 from homeassistant.helpers.update_coordinator import DataUpdateCoordinator, UpdateFailed
 from homeassistant.helpers import (
     config_validation as cv,
@@ -23,6 +35,9 @@ from homeassistant.helpers.dispatcher import (
 )
 
 from .kvartac_api import KvartaCApi, ApiError, ApiAuthError
+from .rows import load_rows
+from .submit import async_submit_readings, parse_reading, summarize
+from .history import KvartaCHistory, async_clear_statistics
 from .const import (
     CONF_UPDATE_INTERVAL,
     DOMAIN,
@@ -30,6 +45,24 @@ from .const import (
     CONF_ORG_ID,
     CONF_PASSWD,
     DEFAULT_UPDATE_INTERVAL,
+    DEFAULT_SUBMIT_CONCURRENCY,
+    DEFAULT_SUBMIT_RATE,
+    SERVICE_SUBMIT_READINGS,
+    SERVICE_IMPORT_HISTORY,
+    SERVICE_PROFILE,
+    EVENT_SUBMIT_REPORT,
+    ATTR_COUNTER_ID,
+    ATTR_VALUE,
+    ATTR_DATE,
+    ATTR_FILENAME,
+    ATTR_READINGS,
+    ATTR_REPORT,
+    ATTR_CONCURRENCY,
+    ATTR_RATE,
+    ATTR_ENTRY_ID,
+    ATTR_RUNS,
+    ATTR_REFRESH,
+    PROFILE_MAX_RUNS,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -37,6 +70,224 @@ _LOGGER = logging.getLogger(__name__)
 
 PLATFORMS: Final = ["sensor"]
 
+CONFIG_SCHEMA = cv.config_entry_only_config_schema(DOMAIN)
+
+SUBMIT_READINGS_SCHEMA: Final = vol.Schema(
+    {
+        vol.Exclusive(ATTR_FILENAME, "source"): cv.string,
+        vol.Exclusive(ATTR_READINGS, "source"): vol.All(cv.ensure_list, [dict]),
+        vol.Optional(ATTR_REPORT): cv.string,
+        vol.Optional(ATTR_CONCURRENCY, default=DEFAULT_SUBMIT_CONCURRENCY): vol.All(
+            vol.Coerce(int), vol.Range(min=1)
+        ),
+        vol.Optional(ATTR_RATE, default=DEFAULT_SUBMIT_RATE): vol.All(
+            vol.Coerce(float), vol.Range(min=0)
+        ),
+    }
+)
+
+IMPORT_HISTORY_SCHEMA: Final = vol.Schema(
+    {
+        vol.Exclusive(ATTR_FILENAME, "source"): cv.string,
+        vol.Exclusive(ATTR_READINGS, "source"): vol.All(cv.ensure_list, [dict]),
+    }
+)
+
+PROFILE_SCHEMA: Final = vol.Schema(
+    {
+        vol.Optional(ATTR_ENTRY_ID): vol.All(cv.ensure_list, [cv.string]),
+        vol.Optional(ATTR_RUNS, default=1): vol.All(
+            vol.Coerce(int), vol.Range(min=1, max=PROFILE_MAX_RUNS)
+        ),
+        vol.Optional(ATTR_REFRESH, default=True): cv.boolean,
+    }
+)
+
+
+async def async_setup(hass: HomeAssistant, config: dict) -> bool:
+    """Set up domain services."""
+
+    async def async_submit_readings_service(call: ServiceCall) -> None:
+        await _async_submit_readings(hass, call.data)
+
+    async def async_import_history_service(call: ServiceCall) -> None:
+        await _async_import_history(hass, call.data)
+
+    async def async_profile_service(call: ServiceCall) -> None:
+        coordinators: dict[str, KvartaCDataUpdateCoordinator] = hass.data.get(
+            DOMAIN, {}
+        )
+        entry_ids = call.data.get(ATTR_ENTRY_ID, list(coordinators))
+        for entry_id in entry_ids:
+            if entry_id not in coordinators:
+                raise HomeAssistantError(f"Неизвестная запись {entry_id}")
+        for entry_id in entry_ids:
+            coordinator = coordinators[entry_id]
+            coordinator.async_profile(call.data[ATTR_RUNS])
+            if call.data[ATTR_REFRESH]:
+                await coordinator.async_request_refresh()
+
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_SUBMIT_READINGS,
+        async_submit_readings_service,
+        schema=SUBMIT_READINGS_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_IMPORT_HISTORY,
+        async_import_history_service,
+        schema=IMPORT_HISTORY_SCHEMA,
+    )
+    hass.services.async_register(
+        DOMAIN,
+        SERVICE_PROFILE,
+        async_profile_service,
+        schema=PROFILE_SCHEMA,
+    )
+
+    return True
+
+
+def _config_path(hass: HomeAssistant, filename: str) -> str:
+    """Return path inside config dir or in allowed external dir."""
+    path = os.path.realpath(hass.config.path(filename))
+    config_dir = os.path.realpath(hass.config.config_dir)
+    if os.path.commonpath([path, config_dir]) != config_dir:
+        if not hass.config.is_allowed_path(path):
+            raise HomeAssistantError(f"Доступ к файлу {path} запрещен")
+    return path
+
+
+def _find_coordinator(
+    hass: HomeAssistant, org_id: str, acc_id: str
+) -> "KvartaCDataUpdateCoordinator | None":
+    """Find coordinator of the account, org_id is optional."""
+    coordinators: dict[str, KvartaCDataUpdateCoordinator] = hass.data.get(DOMAIN, {})
+    return next(
+        (
+            coordinator
+            for coordinator in coordinators.values()
+            if coordinator.api.account_id == acc_id
+            and (not org_id or coordinator.api.organisation_id == org_id)
+        ),
+        None,
+    )
+
+
+def _parse_date(value: Any) -> date:
+    if isinstance(value, date):
+        return value
+    value = str(value).strip()
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return datetime.strptime(value, "%d.%m.%Y").date()
+
+
+async def _async_import_history(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    rows = data.get(ATTR_READINGS)
+    if ATTR_FILENAME in data:
+        path = _config_path(hass, data[ATTR_FILENAME])
+        rows = await hass.async_add_executor_job(load_rows, path)
+    if not rows:
+        raise HomeAssistantError("Нет показаний для загрузки")
+
+    changed: dict[str, KvartaCDataUpdateCoordinator] = {}
+    for row in rows:
+        reading = parse_reading(row)
+        coordinator = _find_coordinator(
+            hass, reading[CONF_ORG_ID], reading[CONF_ACC_ID]
+        )
+        if coordinator is None:
+            _LOGGER.warning("Unknown account %s", reading[CONF_ACC_ID])
+            continue
+        if reading[ATTR_COUNTER_ID] not in coordinator.api.counters:
+            _LOGGER.warning(
+                "Unknown counter %s of account %s",
+                reading[ATTR_COUNTER_ID],
+                reading[CONF_ACC_ID],
+            )
+            continue
+        try:
+            day = _parse_date(row.get(ATTR_DATE))
+            value = float(reading[ATTR_VALUE])
+        except (TypeError, ValueError):
+            _LOGGER.warning("Invalid history row %s", row)
+            continue
+        if value.is_integer():
+            value = int(value)
+        if coordinator.history.add(reading[ATTR_COUNTER_ID], day, value):
+            changed[coordinator.api.uid] = coordinator
+
+    _LOGGER.info("History of %d accounts was changed", len(changed))
+    # listeners import changed history to long-term statistics
+    for coordinator in changed.values():
+        coordinator.async_update_listeners()
+
+
+async def _async_submit_readings(hass: HomeAssistant, data: dict[str, Any]) -> None:
+    rows = data.get(ATTR_READINGS)
+    if ATTR_FILENAME in data:
+        path = _config_path(hass, data[ATTR_FILENAME])
+        rows = await hass.async_add_executor_job(load_rows, path)
+    if not rows:
+        raise HomeAssistantError("Нет показаний для передачи")
+
+    @contextlib.asynccontextmanager
+    async def api_context(org_id: str, acc_id: str):
+        coordinator = _find_coordinator(hass, org_id, acc_id)
+        if coordinator is None:
+            yield None
+            return
+        # portal keeps login state in cookies, so every account needs its own
+        # cookie jar instead of shared session used by all coordinators
+        session = async_create_clientsession(
+            hass, auto_cleanup=False, cookie_jar=aiohttp.CookieJar()
+        )
+        try:
+            api = KvartaCApi(
+                session,
+                coordinator.api.organisation_id,
+                coordinator.api.account_id,
+                coordinator.api.password,
+            )
+            # readings are validated against already fetched values
+            api.counters = dict(coordinator.api.counters)
+            yield api, False
+        finally:
+            await session.close()
+        # values are fetched back only after readings were posted, share them
+        # with the coordinator instead of another login and fetch
+        if api.prev_save_date is not None:
+            coordinator.api.counters = api.counters
+            coordinator.api.prev_save_date = api.prev_save_date
+            coordinator.history.update(coordinator.api)
+            coordinator.async_update_listeners()
+
+    results = []
+    async for report in async_submit_readings(
+        [parse_reading(row) for row in rows],
+        api_context,
+        data[ATTR_CONCURRENCY],
+        data[ATTR_RATE],
+    ):
+        results.extend(report)
+
+    report = summarize(results)
+    _LOGGER.info("Readings submitted: %s", report["summary"])
+
+    if ATTR_REPORT in data:
+        path = _config_path(hass, data[ATTR_REPORT])
+
+        def _write_report():
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(report, file, ensure_ascii=False, indent=2)
+
+        await hass.async_add_executor_job(_write_report)
+
+    hass.bus.async_fire(EVENT_SUBMIT_REPORT, report)
+
 
 async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Set up from a config entry."""
@@ -52,6 +303,7 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     coordinator = KvartaCDataUpdateCoordinator(hass, entry)
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    await coordinator.history.async_load()
     await coordinator.async_config_entry_first_refresh()
 
     # add options handler
@@ -68,6 +320,19 @@ async def async_update_options(hass: HomeAssistant, entry: ConfigEntry):
     await hass.config_entries.async_reload(entry.entry_id)
 
 
+async def async_remove_entry(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Remove stored data and long-term statistics of a config entry."""
+    history = KvartaCHistory(hass, entry.entry_id)
+    await history.async_load()
+    api = KvartaCApi(
+        async_get_clientsession(hass),
+        entry.data[CONF_ORG_ID],
+        entry.data[CONF_ACC_ID],
+    )
+    async_clear_statistics(hass, history, api)
+    await history.async_remove()
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a config entry."""
     unload_ok = await hass.config_entries.async_unload_platforms(entry, PLATFORMS)
@@ -83,6 +348,55 @@ async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     return unload_ok
 
 
+class _UpdateProfiler:
+    """Profiler shared by all entries, only one run is active at a time.
+
+    Profiler is enabled only around synchronous sections of the update cycle
+    (parse, history and entity fan-out), so other coroutines running on the
+    event loop while update waits for the network are not profiled.
+    """
+
+    def __init__(self):
+        self._profiler = cProfile.Profile(builtins=False)
+        self._owner: str | None = None
+
+    def acquire(self, owner: str) -> bool:
+        """Start profiling run, False when another run is active."""
+        if self._owner is not None:
+            _LOGGER.debug("Profiling of %s is in progress, skipping", self._owner)
+            return False
+        self._owner = owner
+        self._profiler.clear()
+        return True
+
+    @contextlib.contextmanager
+    def section(self):
+        """Profile synchronous section of the run."""
+        enabled = False
+        try:
+            self._profiler.enable()
+            enabled = True
+        except ValueError:
+            _LOGGER.debug("Another profiler is active, section is not profiled")
+        try:
+            yield
+        finally:
+            if enabled:
+                self._profiler.disable()
+
+    def release(self) -> pstats.Stats | None:
+        """Finish profiling run and return collected stats."""
+        self._owner = None
+        try:
+            return pstats.Stats(self._profiler)
+        except TypeError:
+            # nothing was profiled
+            return None
+
+
+_PROFILER: Final = _UpdateProfiler()
+
+
 # https://developers.home-assistant.io/docs/integration_fetching_data/#polling-api-endpoints
 class KvartaCDataUpdateCoordinator(DataUpdateCoordinator):
     """Kvarta-C data update coordinator."""
@@ -106,14 +420,93 @@ class KvartaCDataUpdateCoordinator(DataUpdateCoordinator):
             entry.data[CONF_ACC_ID],
             entry.data[CONF_PASSWD],
         )
+        self.history = KvartaCHistory(hass, entry.entry_id)
+        self._profile_runs = 0
+        # start time of the active profiling run
+        self._profile_start: float | None = None
+        # listeners called after the profiled update finish the run
+        self._profile_fan_out = False
+
+    @callback
+    def async_profile(self, runs: int) -> None:
+        """Profile next runs of the update cycle."""
+        self._profile_runs = min(runs, PROFILE_MAX_RUNS)
 
     async def _async_update_data(self):
         """Fetch data from API endpoint."""
+        if self._profile_start is not None:
+            # listeners were not called after the previous profiled run
+            self._async_finish_profile()
+        if self._profile_runs and _PROFILER.acquire(self.api.uid):
+            self._profile_runs -= 1
+            self._profile_start = time.perf_counter()
+            self.api.timings.clear()
+            self.api.profile_section = _PROFILER.section
+        try:
+            result = await self._async_fetch_data()
+        except BaseException:
+            if self._profile_start is not None:
+                self._async_finish_profile()
+            raise
+        self._profile_fan_out = self._profile_start is not None
+        return result
+
+    @callback
+    def async_update_listeners(self) -> None:
+        """Update all registered listeners, profile them during the run."""
+        if not self._profile_fan_out:
+            super().async_update_listeners()
+            return
+        start = time.perf_counter()
+        with _PROFILER.section():
+            super().async_update_listeners()
+        self.api.timings["fan-out"] = time.perf_counter() - start
+        self._async_finish_profile()
+
+    @callback
+    def _async_finish_profile(self) -> None:
+        total = time.perf_counter() - self._profile_start
+        self._profile_start = None
+        self._profile_fan_out = False
+        self.api.profile_section = contextlib.nullcontext
+        self.hass.async_create_task(
+            self._async_save_profile(_PROFILER.release(), total)
+        )
+
+    async def _async_save_profile(self, stats: pstats.Stats | None, total: float):
+        # login, fetch and decode include waiting for the network, they are
+        # measured by wall clock and are not in the profile
+        timings = ", ".join(f"{k} {v:.3f}s" for k, v in self.api.timings.items())
+        if stats is None:
+            _LOGGER.info(
+                "Update of %s took %.3fs (wall-clock %s)", self.api.uid, total, timings
+            )
+            return
+        path = self.hass.config.path(
+            f"{DOMAIN}_profile_{self.api.uid}_{time.strftime('%Y%m%d_%H%M%S')}.prof"
+        )
+        try:
+            await self.hass.async_add_executor_job(stats.dump_stats, path)
+        except OSError as err:
+            _LOGGER.error("Can't save profile to %s: %s", path, err)
+            return
+        _LOGGER.info(
+            "Update of %s took %.3fs (wall-clock %s), profile of parse, history"
+            " and fan-out saved to %s",
+            self.api.uid,
+            total,
+            timings,
+            path,
+        )
+
+    async def _async_fetch_data(self):
         try:
             # asyncio.TimeoutError and aiohttp.ClientError are already
             # handled by the data update coordinator.
             async with async_timeout.timeout(10):
                 await self.api.async_fetch()
+                with self.api.profile_section():
+                    self.history.update(self.api)
                 return True
         except ApiAuthError as err:
             # Raising ConfigEntryAuthFailed will cancel future updates
@@ -0,0 +1,388 @@
+"""Kvarta-C command line interface.
+
+Bulk access to many accounts without Home Assistant, e.g.:
+
+    python custom_components/kvartac/cli.py fetch accounts.csv -f jsonl
+    python custom_components/kvartac/cli.py submit readings.csv -f csv
+"""
+import argparse
+import asyncio
+import contextlib
+import csv
+import json
+import logging
+import os
+import statistics
+import sys
+import time
+import types
+from typing import Any, AsyncIterator, ContextManager, Final, TextIO
+
+import aiohttp
+import async_timeout
+
+if __name__ == "__main__" and not __package__:
+    # executed as a script, register the package without running integration
+    # __init__ so only api and helper modules are imported
+    __package__ = "kvartac"  # pylint: disable=redefined-builtin
+    sys.modules[__package__] = types.ModuleType(__package__)
+    sys.modules[__package__].__path__ = [os.path.dirname(os.path.abspath(__file__))]
+
+# pylint: disable=wrong-import-position
+
+from .kvartac_api import KvartaCApi
+from .rows import load_rows, open_input
+from .submit import (
+    REPORT_FIELDS,
+    async_submit_readings,
+    format_error,
+    parse_reading,
+)
+from .const import (
+    CONF_ACC_ID,
+    CONF_ORG_ID,
+    CONF_PASSWD,
+    DEFAULT_SUBMIT_RATE,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CONCURRENCY: Final = 10
+DEFAULT_TIMEOUT: Final = 30
+
+FORMAT_JSONL: Final = "jsonl"
+FORMAT_CSV: Final = "csv"
+
+FETCH_CSV_FIELDS: Final = [
+    CONF_ORG_ID,
+    CONF_ACC_ID,
+    "status",
+    "error",
+    "elapsed",
+    "account",
+    "organisation",
+    "prev_save_date",
+    "counter_id",
+    KvartaCApi.COUNTER_ID,
+    KvartaCApi.COUNTER_SERVICE,
+    KvartaCApi.COUNTER_VALUE,
+]
+
+
+def load_accounts(filename: str) -> list[dict[str, str]]:
+    """Load org/account/password credentials, dropping duplicate accounts."""
+    accounts: dict[tuple[str, str], dict[str, str]] = {}
+    for row in load_rows(filename):
+        org_id = str(row.get(CONF_ORG_ID) or "")
+        acc_id = str(row.get(CONF_ACC_ID) or "")
+        if not org_id or not acc_id:
+            _LOGGER.warning("Skipping row without %s/%s", CONF_ORG_ID, CONF_ACC_ID)
+            continue
+        accounts[(org_id, acc_id)] = {
+            CONF_ORG_ID: org_id,
+            CONF_ACC_ID: acc_id,
+            CONF_PASSWD: str(row.get(CONF_PASSWD) or ""),
+        }
+    return list(accounts.values())
+
+
+def create_connector(concurrency: int) -> aiohttp.TCPConnector:
+    """Create connector shared between all per-account sessions."""
+    return aiohttp.TCPConnector(limit=concurrency, ttl_dns_cache=300)
+
+
+def create_session(connector: aiohttp.TCPConnector) -> aiohttp.ClientSession:
+    """Create session with own cookie jar on top of the shared connector.
+
+    Portal keeps login state in cookies, so accounts can't share a session,
+    but they can share pooled connections.
+    """
+    return aiohttp.ClientSession(connector=connector, connector_owner=False)
+
+
+def api_as_dict(api: KvartaCApi) -> dict[str, Any]:
+    """Return fetched api data as a serializable dict."""
+    return {
+        "account": api.account,
+        "organisation": api.organisation,
+        "prev_save_date": api.prev_save_date.isoformat()
+        if api.prev_save_date
+        else None,
+        "counters": api.counters,
+    }
+
+
+async def _async_fetch_account(
+    connector: aiohttp.TCPConnector,
+    semaphore: asyncio.Semaphore,
+    account: dict[str, str],
+    timeout: float,
+) -> dict[str, Any]:
+    result: dict[str, Any] = {
+        CONF_ORG_ID: account[CONF_ORG_ID],
+        CONF_ACC_ID: account[CONF_ACC_ID],
+    }
+    async with semaphore:
+        start = time.perf_counter()
+        try:
+            async with create_session(connector) as session:
+                api = KvartaCApi(
+                    session,
+                    account[CONF_ORG_ID],
+                    account[CONF_ACC_ID],
+                    account[CONF_PASSWD],
+                )
+                async with async_timeout.timeout(timeout):
+                    await api.async_fetch()
+            result["status"] = "ok"
+            result.update(api_as_dict(api))
+        except Exception as err:  # pylint: disable=broad-except
+            result["status"] = "error"
+            result["error"] = format_error(err)
+        result["elapsed"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+async def async_fetch_accounts(
+    accounts: list[dict[str, str]],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    timeout: float = DEFAULT_TIMEOUT,
+) -> AsyncIterator[dict[str, Any]]:
+    """Fetch accounts concurrently, yielding results as they complete."""
+    semaphore = asyncio.Semaphore(concurrency)
+    async with create_connector(concurrency) as connector:
+        tasks = [
+            asyncio.create_task(
+                _async_fetch_account(connector, semaphore, account, timeout)
+            )
+            for account in accounts
+        ]
+        try:
+            for task in asyncio.as_completed(tasks):
+                yield await task
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+class ResultWriter:
+    """Stream results as JSON Lines or CSV."""
+
+    def __init__(self, file: TextIO, fmt: str, csv_fields: list[str]):
+        self._file = file
+        self._csv = None
+        if fmt == FORMAT_CSV:
+            self._csv = csv.DictWriter(
+                file, fieldnames=csv_fields, extrasaction="ignore"
+            )
+            self._csv.writeheader()
+
+    def write(self, result: dict[str, Any]) -> None:
+        """Write single result, CSV output gets one row per counter."""
+        if self._csv is None:
+            self._file.write(json.dumps(result, ensure_ascii=False) + "\n")
+        else:
+            counters = result.get("counters") or {}
+            if not counters:
+                self._csv.writerow(result)
+            for counter_id, counter in counters.items():
+                self._csv.writerow({**result, "counter_id": counter_id, **counter})
+        self._file.flush()
+
+
+class Stats:
+    """Timing statistics collector."""
+
+    def __init__(self):
+        self._start = time.perf_counter()
+        self.elapsed: list[float] = []
+        self.failed = 0
+
+    def add(self, result: dict[str, Any]) -> None:
+        """Account single result."""
+        self.elapsed.append(result.get("elapsed", 0))
+        if result.get("status") != "ok":
+            self.failed += 1
+
+    def format(self) -> str:
+        """Return human readable summary."""
+        wall = time.perf_counter() - self._start
+        total = len(self.elapsed)
+        lines = [
+            f"total: {total}, ok: {total - self.failed}, failed: {self.failed}",
+            f"wall time: {wall:.3f}s, rate: {total / wall if wall else 0:.1f}/s",
+        ]
+        if total:
+            values = sorted(self.elapsed)
+            lines.append(
+                f"latency: min {values[0]:.3f}s"
+                f", mean {statistics.fmean(values):.3f}s"
+                f", p50 {values[(total - 1) // 2]:.3f}s"
+                f", p95 {values[min(total - 1, int(total * 0.95))]:.3f}s"
+                f", max {values[-1]:.3f}s"
+            )
+        return "\n".join(lines)
+
+
+def _open_output(filename: str) -> ContextManager[TextIO]:
+    if filename == "-":
+        return contextlib.nullcontext(sys.stdout)
+    return open(filename, "w", encoding="utf-8", newline="")
+
+
+async def async_fetch_command(args: argparse.Namespace) -> int:
+    """Fetch all accounts from input file."""
+    accounts = load_accounts(args.input)
+    stats = Stats()
+    with _open_output(args.output) as file:
+        writer = ResultWriter(file, args.format, FETCH_CSV_FIELDS)
+        async for result in async_fetch_accounts(
+            accounts, args.concurrency, args.timeout
+        ):
+            stats.add(result)
+            writer.write(result)
+    if not args.quiet:
+        print(stats.format(), file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def load_last_values(filename: str) -> dict[tuple[str, str], dict[str, Any]]:
+    """Load cached counters from JSON Lines output of fetch command."""
+    last: dict[tuple[str, str], dict[str, Any]] = {}
+    with open_input(filename) as file:
+        for line in file:
+            if not line.strip():
+                continue
+            result = json.loads(line)
+            if result.get("status") == "ok":
+                key = (result[CONF_ORG_ID], result[CONF_ACC_ID])
+                last[key] = result["counters"]
+    return last
+
+
+async def async_submit_command(args: argparse.Namespace) -> int:
+    """Submit readings from input file."""
+    rows = load_rows(args.input)
+    passwords = {
+        (str(row.get(CONF_ORG_ID) or ""), str(row.get(CONF_ACC_ID) or "")): str(
+            row.get(CONF_PASSWD) or ""
+        )
+        for row in rows
+    }
+    last = load_last_values(args.last) if args.last else {}
+    stats = Stats()
+
+    async with create_connector(args.concurrency) as connector:
+
+        @contextlib.asynccontextmanager
+        async def api_context(org_id: str, acc_id: str):
+            if not org_id or not acc_id:
+                yield None
+                return
+            async with create_session(connector) as session:
+                passwd = passwords[(org_id, acc_id)]
+                api = KvartaCApi(session, org_id, acc_id, passwd)
+                counters = last.get((org_id, acc_id))
+                if counters:
+                    api.counters = counters
+                yield api, not counters
+
+        with _open_output(args.output) as file:
+            writer = ResultWriter(file, args.format, REPORT_FIELDS)
+            async for report in async_submit_readings(
+                [parse_reading(row) for row in rows],
+                api_context,
+                args.concurrency,
+                args.rate,
+                args.timeout,
+            ):
+                for result in report:
+                    stats.add(result)
+                    writer.write(result)
+
+    if not args.quiet:
+        print(stats.format(), file=sys.stderr)
+    return 1 if stats.failed else 0
+
+
+def _add_common_args(parser: argparse.ArgumentParser, input_help: str) -> None:
+    parser.add_argument("input", help=f"{input_help} ('-' for stdin)")
+    parser.add_argument(
+        "-o", "--output", default="-", help="output file (default: stdout)"
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=[FORMAT_JSONL, FORMAT_CSV],
+        default=FORMAT_JSONL,
+        help="output format (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="max parallel accounts and connections (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-t",
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        help="per account timeout in seconds (default: %(default)s)",
+    )
+    parser.add_argument(
+        "-q", "--quiet", action="store_true", help="do not print timing stats"
+    )
+    parser.add_argument("-v", "--verbose", action="store_true", help="debug logging")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build command line parser."""
+    parser = argparse.ArgumentParser(
+        prog="kvartac", description="Kvarta-C bulk access tool"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    fetch = commands.add_parser("fetch", help="fetch data of many accounts")
+    _add_common_args(fetch, "CSV or JSON file with org_id, acc_id, passwd")
+    fetch.set_defaults(handler=async_fetch_command)
+
+    submit = commands.add_parser("submit", help="submit readings of many accounts")
+    _add_common_args(
+        submit,
+        "CSV or JSON file with org_id, acc_id, passwd, counter_id, value",
+    )
+    submit.add_argument(
+        "-l",
+        "--last",
+        help="JSON Lines output of fetch command to validate readings against"
+        " without fetching accounts first",
+    )
+    submit.add_argument(
+        "-r",
+        "--rate",
+        type=float,
+        default=DEFAULT_SUBMIT_RATE,
+        help="max portal requests per second, 0 to disable (default: %(default)s)",
+    )
+    submit.set_defaults(handler=async_submit_command)
+
+    return parser
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Command line entry point."""
+    args = build_parser().parse_args(argv)
+    if args.concurrency < 1:
+        print("concurrency must be positive", file=sys.stderr)
+        return 2
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING,
+        stream=sys.stderr,
+    )
+    return asyncio.run(args.handler(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -190,6 +190,12 @@ class OptionsFlowHandler(config_entries.OptionsFlow):
                             const.CONF_PREV_DATE_SENSOR, True
                         ),
                     ): selector.BooleanSelector(selector.BooleanSelectorConfig()),
+                    vol.Optional(
+                        const.CONF_FORECAST_SENSORS,
+                        default=self.config_entry.options.get(
+                            const.CONF_FORECAST_SENSORS, True
+                        ),
+                    ): selector.BooleanSelector(selector.BooleanSelectorConfig()),
                     vol.Optional(
                         const.CONF_DIAGNOSTIC_SENSORS,
                         default=self.config_entry.options.get(
@@ -11,7 +11,29 @@ CONF_PASSWD: Final = "passwd"
 CONF_UPDATE_INTERVAL: Final = "update_interval"
 CONF_DIAGNOSTIC_SENSORS: Final = "diagnostic_sensors"
 CONF_PREV_DATE_SENSOR: Final = "prev_date_sensor"
+CONF_FORECAST_SENSORS: Final = "forecast_sensors"
 
 DEFAULT_UPDATE_INTERVAL: Final = datetime.timedelta(hours=12)
+DEFAULT_SUBMIT_CONCURRENCY: Final = 4
+DEFAULT_SUBMIT_RATE: Final = 2.0
 
 SERVICE_UPDATE_VALUE_CODE: Final = "update_value"
+SERVICE_SUBMIT_READINGS: Final = "submit_readings"
+SERVICE_IMPORT_HISTORY: Final = "import_history"
+SERVICE_PROFILE: Final = "profile"
+
+EVENT_SUBMIT_REPORT: Final = f"{DOMAIN}_submit_report"
+
+ATTR_COUNTER_ID: Final = "counter_id"
+ATTR_VALUE: Final = "value"
+ATTR_DATE: Final = "date"
+ATTR_FILENAME: Final = "filename"
+ATTR_READINGS: Final = "readings"
+ATTR_REPORT: Final = "report"
+ATTR_CONCURRENCY: Final = "concurrency"
+ATTR_RATE: Final = "rate"
+ATTR_ENTRY_ID: Final = "entry_id"
+ATTR_RUNS: Final = "runs"
+ATTR_REFRESH: Final = "refresh"
+
+PROFILE_MAX_RUNS: Final = 10
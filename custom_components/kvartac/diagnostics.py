@@ -0,0 +1,44 @@
+"""Diagnostics support for kvartac."""
+import logging
+from typing import Any
+
+from homeassistant.components.diagnostics import async_redact_data
+from homeassistant.config_entries import ConfigEntry
+from homeassistant.core import HomeAssistant
+
+from . import const, KvartaCDataUpdateCoordinator
+
+_LOGGER = logging.getLogger(__package__)
+
+TO_REDACT = {const.CONF_PASSWD, "account", "organisation"}
+
+
+async def async_get_config_entry_diagnostics(
+    hass: HomeAssistant, entry: ConfigEntry
+) -> dict[str, Any]:
+    """Return diagnostics for a config entry.
+
+    Raw portal pages contain tenant name and address, they are included only
+    when debug logging of the integration is enabled.
+    """
+    coordinator: KvartaCDataUpdateCoordinator = hass.data[const.DOMAIN][entry.entry_id]
+    api = coordinator.api
+
+    return {
+        "entry": {
+            "data": async_redact_data(entry.data, TO_REDACT),
+            "options": dict(entry.options),
+        },
+        "account": async_redact_data(
+            {
+                "account": api.account,
+                "organisation": api.organisation,
+                "prev_save_date": api.prev_save_date.isoformat()
+                if api.prev_save_date
+                else None,
+                "counters": api.counters,
+            },
+            TO_REDACT,
+        ),
+        "responses": api.responses.as_list(_LOGGER.isEnabledFor(logging.DEBUG)),
+    }
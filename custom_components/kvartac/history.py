@@ -0,0 +1,232 @@
+"""Counter readings history routines"""
+import bisect
+import logging
+from datetime import date, timedelta
+from typing import Any, Final, NamedTuple
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+from homeassistant.util import dt as dt_util
+from homeassistant.components.recorder import get_instance
+from homeassistant.components.recorder.models import StatisticData, StatisticMetaData
+from homeassistant.components.recorder.statistics import async_add_external_statistics
+
+from .kvartac_api import KvartaCApi
+from . import const
+
+_LOGGER = logging.getLogger(__name__)
+
+STORAGE_VERSION: Final = 1
+SAVE_DELAY: Final = 10
+
+# number of last readings used for the forecast
+FORECAST_WINDOW: Final = 6
+
+# indexes of history record [day ordinal, value, sum]
+_DAY: Final = 0
+_VALUE: Final = 1
+_SUM: Final = 2
+
+
+class Forecast(NamedTuple):
+    """Consumption forecast of the counter"""
+
+    # consumption between the last two saved readings
+    consumption: int | float
+    daily_rate: float
+    next_date: date
+    projected_value: float
+
+
+class KvartaCHistory:
+    """Per-counter history of readings keyed by save date.
+
+    Every record is [day ordinal, value, sum], where sum is incrementally
+    accumulated consumption suitable for long-term statistics. New readings
+    are appended, backfilled ones are inserted in date order.
+    """
+
+    def __init__(self, hass: HomeAssistant, entry_id: str):
+        self._store = Store(hass, STORAGE_VERSION, f"{const.DOMAIN}.{entry_id}")
+        # counter_id -> {"records": [[day, value, sum], ...], "pending": day}
+        self._data: dict[str, dict[str, Any]] = {}
+        self._forecasts: dict[str, Forecast | None] = {}
+        # counter_id -> number of changes, tells whether pending statistics
+        # were changed while being imported
+        self._revisions: dict[str, int] = {}
+
+    async def async_load(self) -> None:
+        """Load history from storage."""
+        self._data = await self._store.async_load() or {}
+
+    async def async_remove(self) -> None:
+        """Remove history from storage."""
+        await self._store.async_remove()
+
+    def _async_save(self) -> None:
+        self._store.async_delay_save(lambda: self._data, SAVE_DELAY)
+
+    def counter_ids(self) -> list[str]:
+        """Return ids of counters having history."""
+        return list(self._data)
+
+    def add(self, counter_id: str, day: date, value: int | float) -> bool:
+        """Add reading, returns True when history was changed."""
+        counter = self._data.setdefault(counter_id, {"records": [], "pending": None})
+        records: list[list] = counter["records"]
+        ordinal = day.toordinal()
+
+        if records and records[-1][_DAY] < ordinal:
+            # fast path, new reading
+            index = len(records)
+        else:
+            index = bisect.bisect_left(records, ordinal, key=lambda rec: rec[_DAY])
+            if index < len(records) and records[index][_DAY] == ordinal:
+                if records[index][_VALUE] == value:
+                    return False
+                del records[index]
+
+        records.insert(index, [ordinal, value, 0])
+        self._update_sums(records, index)
+
+        pending = counter["pending"]
+        counter["pending"] = ordinal if pending is None else min(pending, ordinal)
+        self._revisions[counter_id] = self._revisions.get(counter_id, 0) + 1
+        self._forecasts.pop(counter_id, None)
+        self._async_save()
+        return True
+
+    def update(self, api: KvartaCApi) -> bool:
+        """Add current readings of all api counters."""
+        if api.prev_save_date is None:
+            return False
+        changed = False
+        for counter_id, counter in api.counters.items():
+            if self.add(
+                counter_id, api.prev_save_date, counter[KvartaCApi.COUNTER_VALUE]
+            ):
+                changed = True
+        return changed
+
+    @staticmethod
+    def _update_sums(records: list[list], start: int) -> None:
+        """Recalculate sums starting from index, O(1) for appended record."""
+        for index in range(start, len(records)):
+            if index == 0:
+                records[index][_SUM] = 0
+                continue
+            prev = records[index - 1]
+            delta = records[index][_VALUE] - prev[_VALUE]
+            # counter value decreased, treat it as counter replacement
+            if delta < 0:
+                delta = records[index][_VALUE]
+            records[index][_SUM] = prev[_SUM] + delta
+
+    def forecast(self, counter_id: str) -> Forecast | None:
+        """Return forecast by last readings, None when there is not enough data.
+
+        Rate is calculated by accumulated sums so it takes O(1) regardless of
+        the window size and is cached until next reading.
+        """
+        if counter_id in self._forecasts:
+            return self._forecasts[counter_id]
+
+        records = self._data.get(counter_id, {}).get("records", [])
+        count = min(len(records), FORECAST_WINDOW)
+        forecast = None
+        if count > 1:
+            first, last = records[-count], records[-1]
+            days = last[_DAY] - first[_DAY]
+            daily_rate = (last[_SUM] - first[_SUM]) / days
+            # average period between readings in the window
+            period = round(days / (count - 1))
+            forecast = Forecast(
+                consumption=last[_SUM] - records[-2][_SUM],
+                daily_rate=daily_rate,
+                next_date=date.fromordinal(last[_DAY]) + timedelta(days=period),
+                projected_value=last[_VALUE] + daily_rate * period,
+            )
+        self._forecasts[counter_id] = forecast
+        return forecast
+
+    def pending(self, counter_id: str) -> tuple[int, list[StatisticData]]:
+        """Return revision of the history and statistics not imported yet."""
+        revision = self._revisions.get(counter_id, 0)
+        counter = self._data.get(counter_id)
+        if counter is None or counter["pending"] is None:
+            return revision, []
+        records = counter["records"]
+        start = bisect.bisect_left(
+            records, counter["pending"], key=lambda rec: rec[_DAY]
+        )
+        return revision, [
+            StatisticData(
+                start=dt_util.start_of_local_day(date.fromordinal(rec[_DAY])),
+                state=rec[_VALUE],
+                sum=rec[_SUM],
+            )
+            for rec in records[start:]
+        ]
+
+    def mark_imported(self, counter_id: str, revision: int) -> None:
+        """Mark statistics as imported unless history was changed meanwhile."""
+        counter = self._data.get(counter_id)
+        if counter is None or self._revisions.get(counter_id, 0) != revision:
+            return
+        counter["pending"] = None
+        self._async_save()
+
+
+def statistic_id(api: KvartaCApi, counter_id: str) -> str:
+    """Return external statistic id of the counter."""
+    return f"{const.DOMAIN}:{api.uid}_{counter_id}".lower()
+
+
+def async_import_statistics(
+    hass: HomeAssistant,
+    history: KvartaCHistory,
+    api: KvartaCApi,
+    counter_id: str,
+    name: str,
+    unit: str | None,
+) -> None:
+    """Import pending history of the counter to long-term statistics.
+
+    History stays pending in storage until recorder has imported it, so the
+    import is repeated after restart in between.
+    """
+    revision, statistics = history.pending(counter_id)
+    if not statistics:
+        return
+    _LOGGER.debug(
+        "Importing %d statistics to %s", len(statistics), statistic_id(api, counter_id)
+    )
+    async_add_external_statistics(
+        hass,
+        StatisticMetaData(
+            has_mean=False,
+            has_sum=True,
+            name=name,
+            source=const.DOMAIN,
+            statistic_id=statistic_id(api, counter_id),
+            unit_of_measurement=unit,
+        ),
+        statistics,
+    )
+
+    async def _async_mark_imported():
+        await get_instance(hass).async_block_till_done()
+        history.mark_imported(counter_id, revision)
+
+    hass.async_create_task(_async_mark_imported())
+
+
+def async_clear_statistics(
+    hass: HomeAssistant, history: KvartaCHistory, api: KvartaCApi
+) -> None:
+    """Clear long-term statistics of all counters having history."""
+    statistic_ids = [
+        statistic_id(api, counter_id) for counter_id in history.counter_ids()
+    ]
+    if statistic_ids:
+        get_instance(hass).async_clear_statistics(statistic_ids)
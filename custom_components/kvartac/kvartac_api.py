@@ -1,14 +1,29 @@
 """Kvarta-C API"""
 import logging
-from typing import Final, TypedDict
+from typing import (
+    Any,
+    AsyncContextManager,
+    Callable,
+    ContextManager,
+    Final,
+    TypedDict,
+)
 from datetime import datetime, date
+from collections import deque
+import contextlib
 import re
-
-from homeassistant import exceptions
+import time
+import zlib
 
 import aiohttp
 from bs4 import BeautifulSoup, ResultSet, Tag
 
+try:
+    from homeassistant.exceptions import HomeAssistantError
+except ImportError:
+    # standalone usage from the command line interface
+    HomeAssistantError = Exception
+
 _LOGGER = logging.getLogger(__name__)
 
 
@@ -20,6 +35,40 @@ class Counter(TypedDict):
     value: int | float
 
 
+class ResponseBuffer:
+    """Ring buffer of last raw responses stored zlib-compressed"""
+
+    def __init__(self, size: int):
+        self._items: deque[tuple[datetime, str, int, int, int, bytes]] = deque(
+            maxlen=size
+        )
+
+    def add(self, url: str, status: int, content: str) -> tuple[str, int]:
+        """Store response and return its short fingerprint and size in bytes."""
+        data = content.encode()
+        crc = zlib.crc32(data)
+        self._items.append(
+            (datetime.now(), url, status, len(data), crc, zlib.compress(data))
+        )
+        return f"{crc:08x}", len(data)
+
+    def as_list(self, content: bool = True) -> list[dict[str, Any]]:
+        """Return responses oldest first, decompressed content is optional."""
+        items = []
+        for stamp, url, status, size, crc, data in self._items:
+            item = {
+                "time": stamp.isoformat(),
+                "url": url,
+                "status": status,
+                "size": size,
+                "fingerprint": f"{crc:08x}",
+            }
+            if content:
+                item["content"] = zlib.decompress(data).decode()
+            items.append(item)
+        return items
+
+
 class KvartaCApi:
     """Kvarta-C API access implementation"""
 
@@ -31,6 +80,8 @@ class KvartaCApi:
     COUNTER_ID = "id"
     COUNTER_SERVICE = "service"
 
+    RESPONSE_BUFFER_SIZE = 5
+
     counters: dict[str, Counter]
 
     def __init__(
@@ -50,6 +101,13 @@ class KvartaCApi:
         self.organisation = ""
         self.prev_save_date: date = None
         self.counters = {}
+        self.responses = ResponseBuffer(self.RESPONSE_BUFFER_SIZE)
+        # duration in seconds of the last login, fetch, decode and parse
+        self.timings: dict[str, float] = {}
+        # async context manager entered before every request, e.g. rate limiter
+        self.limiter: AsyncContextManager = contextlib.nullcontext()
+        # context manager wrapping synchronous parsing, used for profiling
+        self.profile_section: Callable[[], ContextManager] = contextlib.nullcontext
 
     def _parse_account(self, links: ResultSet[Tag]):
         _LOGGER.debug("Parsing account")
@@ -152,38 +210,69 @@ class KvartaCApi:
             "accountid": self.account_id,
             "password": self.password,
         }
-        _LOGGER.debug("POST %s: %s", self._LOGIN_URL, str(data))
-        resp = await self._session.post(self._LOGIN_URL, data=data)
+        _LOGGER.debug(
+            "POST %s: tsgid=%s, accountid=%s",
+            self._LOGIN_URL,
+            self.organisation_id,
+            self.account_id,
+        )
+        async with self.limiter:
+            start = time.perf_counter()
+            resp = await self._session.post(self._LOGIN_URL, data=data)
+            content = await resp.text()
+        self.timings["login"] = time.perf_counter() - start
+        fingerprint, _ = self.responses.add(self._LOGIN_URL, resp.status, content)
         if resp.status != 200:
+            _LOGGER.debug("Login status %d, fingerprint %s", resp.status, fingerprint)
             raise ApiError
 
     async def _async_fetch(self) -> None:
-        resp = await self._session.get(self._TENANT_URL)
+        async with self.limiter:
+            start = time.perf_counter()
+            resp = await self._session.get(self._TENANT_URL)
+        self.timings["fetch"] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        content = await resp.text()
+        self.timings["decode"] = time.perf_counter() - start
+        fingerprint, size = self.responses.add(self._TENANT_URL, resp.status, content)
         if resp.status != 200:
+            _LOGGER.debug("Fetch status %d, fingerprint %s", resp.status, fingerprint)
             raise ApiError
 
-        content = await resp.text()
-        res = self._parse_html(content)
+        start = time.perf_counter()
+        with self.profile_section():
+            res = self._parse_html(content)
+        self.timings["parse"] = time.perf_counter() - start
         if not res:
-            _LOGGER.error(content)
+            _LOGGER.error(
+                "Can't parse response of %s: %d bytes, fingerprint %s",
+                self.uid,
+                size,
+                fingerprint,
+            )
             raise ApiAuthError
 
-    async def _async_update(self, counter_id: str, value: int):
-        resp = await self._session.post(
-            self._LOGIN_URL,
-            data={
-                "action": "tenant",
-                "subaction": "tenantedit",
-                "usertype": "tenant",
-                counter_id: value,
-            },
+    async def _async_update(self, values: dict[str, int]):
+        async with self.limiter:
+            resp = await self._session.post(
+                self._LOGIN_URL,
+                data={
+                    "action": "tenant",
+                    "subaction": "tenantedit",
+                    "usertype": "tenant",
+                    **values,
+                },
+            )
+
+        fingerprint, _ = self.responses.add(
+            self._LOGIN_URL, resp.status, await resp.text()
         )
+        _LOGGER.debug("Update response fingerprint %s", fingerprint)
 
         if resp.status != 200:
             raise ApiError
 
-        # text = await resp.text()
-        # _LOGGER.debug("result of update is: %s", text)
         # TODO check "Data is updated." to be sure that update was success
 
     async def async_fetch(self) -> None:
@@ -193,8 +282,12 @@ class KvartaCApi:
 
     async def async_update(self, counter_id: str, value: int):
         """Login, update and fetch new counter value"""
+        await self.async_update_values({counter_id: value})
+
+    async def async_update_values(self, values: dict[str, int]):
+        """Login, update and fetch new values of several counters at once"""
         await self._async_login()
-        await self._async_update(counter_id, value)
+        await self._async_update(values)
         await self._async_fetch()
 
     def parse(self, session) -> bool:
@@ -222,9 +315,9 @@ class KvartaCApi:
         return f"{self.organisation_id}_{self.account_id}"
 
 
-class ApiError(exceptions.HomeAssistantError):
+class ApiError(HomeAssistantError):
     """Error to indicate api error."""
 
 
-class ApiAuthError(exceptions.HomeAssistantError):
+class ApiAuthError(HomeAssistantError):
     """Error to indicate auth error."""
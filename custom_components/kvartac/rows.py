@@ -0,0 +1,34 @@
+"""Input rows loading routines"""
+import contextlib
+import csv
+import json
+import sys
+from typing import Any, ContextManager, TextIO
+
+
+def open_input(filename: str) -> ContextManager[TextIO]:
+    """Open file for reading, '-' stands for stdin.
+
+    UTF-8 BOM written by Excel is skipped, otherwise it ends up in the first
+    CSV column name.
+    """
+    if filename == "-":
+        return contextlib.nullcontext(sys.stdin)
+    return open(filename, "r", encoding="utf-8-sig", newline="")
+
+
+def load_rows(filename: str) -> list[dict[str, Any]]:
+    """Load rows from CSV (with header) or JSON (list of objects) file."""
+    with open_input(filename) as file:
+        content = file.read().lstrip("\ufeff")
+    if content.lstrip().startswith("["):
+        rows = json.loads(content)
+    else:
+        rows = list(csv.DictReader(content.splitlines()))
+    return [
+        {
+            str(key).strip(): val.strip() if isinstance(val, str) else val
+            for key, val in row.items()
+        }
+        for row in rows
+    ]
@@ -13,7 +13,7 @@ from homeassistant.components.sensor import (
 )
 from homeassistant.helpers.entity import DeviceInfo, EntityCategory
 
-from homeassistant.core import HomeAssistant, HomeAssistantError
+from homeassistant.core import HomeAssistant, HomeAssistantError, callback
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.helpers.update_coordinator import CoordinatorEntity
 from homeassistant.helpers import entity_platform
@@ -22,6 +22,7 @@ from homeassistant.helpers.device_registry import DeviceEntryType
 from homeassistant.const import UnitOfVolume, UnitOfEnergy
 
 from .kvartac_api import KvartaCApi
+from .history import async_import_statistics
 from . import const, KvartaCDataUpdateCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -57,6 +58,22 @@ SENSOR_WATER_COLD: Final = SensorEntityDescription(
     state_class=SensorStateClass.TOTAL_INCREASING,
 )
 
+SENSOR_CONSUMPTION: Final = SensorEntityDescription(
+    key="consumption",
+    icon="mdi:counter",
+)
+
+SENSOR_DAILY_RATE: Final = SensorEntityDescription(
+    key="daily_rate",
+    icon="mdi:chart-line",
+    state_class=SensorStateClass.MEASUREMENT,
+)
+
+SENSOR_PROJECTED_VALUE: Final = SensorEntityDescription(
+    key="projected_value",
+    icon="mdi:crystal-ball",
+)
+
 SENSOR_SAVE_DATE: Final = SensorEntityDescription(
     key="save_date",
     entity_registry_enabled_default=True,
@@ -75,14 +92,41 @@ async def async_setup_entry(
     coordinator: KvartaCDataUpdateCoordinator = hass.data[const.DOMAIN][entry.entry_id]
 
     diag = entry.options.get(const.CONF_DIAGNOSTIC_SENSORS, False)
-    async_add_entities(
+    counters = [
         KvartaCCounterSensor(coordinator, entry.entry_id, counter, diag)
         for counter in coordinator.api.counters.keys()
-    )
+    ]
+    async_add_entities(counters)
+
+    @callback
+    def _async_import_statistics():
+        for sensor in counters:
+            async_import_statistics(
+                hass,
+                coordinator.history,
+                coordinator.api,
+                sensor.counter_id,
+                sensor.name,
+                sensor.entity_description.native_unit_of_measurement,
+            )
+
+    _async_import_statistics()
+    entry.async_on_unload(coordinator.async_add_listener(_async_import_statistics))
 
     if entry.options.get(const.CONF_PREV_DATE_SENSOR, True):
         async_add_entities([KvartaCDiagnosticSensor(coordinator, entry.entry_id)])
 
+    if entry.options.get(const.CONF_FORECAST_SENSORS, True):
+        async_add_entities(
+            KvartaCForecastSensor(coordinator, entry.entry_id, counter, description)
+            for counter in coordinator.api.counters.keys()
+            for description in (
+                SENSOR_CONSUMPTION,
+                SENSOR_DAILY_RATE,
+                SENSOR_PROJECTED_VALUE,
+            )
+        )
+
     min_value = None
     for counter in coordinator.api.counters.values():
         value = counter[KvartaCApi.COUNTER_VALUE]
@@ -101,6 +145,16 @@ async def async_setup_entry(
     )
 
 
+def _counter_description(service: str) -> SensorEntityDescription:
+    if service.lower().endswith("энергия"):
+        return SENSOR_ELECTRICITY
+    if service.lower().startswith("газ"):
+        return SENSOR_GAS
+    if service.lower().startswith("гор"):
+        return SENSOR_WATER_HOT
+    return SENSOR_WATER_COLD
+
+
 class _KvartaCSensor(CoordinatorEntity[KvartaCDataUpdateCoordinator], SensorEntity):
     def __init__(self, coordinator: KvartaCDataUpdateCoordinator, entry_id: str):
         super().__init__(coordinator)
@@ -176,18 +230,16 @@ class KvartaCCounterSensor(_KvartaCSensor):
             "organisation_id": self._api.organisation_id,
         }
 
-        if service.lower().endswith("энергия"):
-            self.entity_description = SENSOR_ELECTRICITY
-        elif service.lower().startswith("газ"):
-            self.entity_description = SENSOR_GAS
-        elif service.lower().startswith("гор"):
-            self.entity_description = SENSOR_WATER_HOT
-        else:
-            self.entity_description = SENSOR_WATER_COLD
+        self.entity_description = _counter_description(service)
 
         if diag_sensors:
             self._attr_entity_category = EntityCategory.DIAGNOSTIC
 
+    @property
+    def counter_id(self) -> str:
+        """Return portal id of the counter."""
+        return self._counter_id
+
     @property
     def _counter(self) -> dict[str, Any]:
         return self._api.counters[self._counter_id]
@@ -210,3 +262,66 @@ class KvartaCCounterSensor(_KvartaCSensor):
         await self._api.async_update(self._counter_id, value)
 
         await self.async_update()
+
+
+class KvartaCForecastSensor(_KvartaCSensor):
+    """Respresent consumption and forecast sensor of the counter."""
+
+    _NAMES: Final = {
+        SENSOR_CONSUMPTION.key: "расход за период",
+        SENSOR_DAILY_RATE.key: "расход в сутки",
+        SENSOR_PROJECTED_VALUE.key: "прогноз",
+    }
+
+    def __init__(
+        self,
+        coordinator: KvartaCDataUpdateCoordinator,
+        entry_id: str,
+        counter_id: str,
+        description: SensorEntityDescription,
+    ):
+        super().__init__(coordinator, entry_id)
+        self._counter_id = counter_id
+        self.entity_description = description
+
+        counter = self._api.counters[counter_id]
+        service = counter[KvartaCApi.COUNTER_SERVICE]
+        counter_description = _counter_description(service)
+
+        uid = f"{self._api.uid}_{counter_id}_{description.key}"
+        self.entity_id = f"sensor.{uid}"
+
+        self._attr_unique_id = f"{const.DOMAIN}.{uid}"
+        self._attr_name = (
+            f"{service} {counter[KvartaCApi.COUNTER_ID]}"
+            f" {self._NAMES[description.key]}"
+        )
+
+        unit = counter_description.native_unit_of_measurement
+        if description is SENSOR_DAILY_RATE:
+            self._attr_native_unit_of_measurement = f"{unit}/d"
+        else:
+            self._attr_native_unit_of_measurement = unit
+            self._attr_device_class = counter_description.device_class
+
+    @property
+    def native_value(self) -> int | float | None:
+        """Return the value of the sensor."""
+        forecast = self.coordinator.history.forecast(self._counter_id)
+        if forecast is None:
+            return None
+        if self.entity_description is SENSOR_CONSUMPTION:
+            return forecast.consumption
+        if self.entity_description is SENSOR_DAILY_RATE:
+            return round(forecast.daily_rate, 3)
+        return round(forecast.projected_value, 3)
+
+    @property
+    def extra_state_attributes(self) -> dict[str, Any] | None:
+        """Return date of the next reading for projected value."""
+        if self.entity_description is not SENSOR_PROJECTED_VALUE:
+            return None
+        forecast = self.coordinator.history.forecast(self._counter_id)
+        if forecast is None:
+            return None
+        return {"date": forecast.next_date.isoformat()}
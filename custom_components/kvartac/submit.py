@@ -0,0 +1,261 @@
+"""Bulk counter readings submission routines"""
+import asyncio
+import logging
+import time
+from typing import (
+    Any,
+    AsyncContextManager,
+    AsyncIterator,
+    Callable,
+    Final,
+    Iterable,
+    TypedDict,
+)
+
+import async_timeout
+
+from .kvartac_api import KvartaCApi
+from .const import CONF_ACC_ID, CONF_ORG_ID, ATTR_COUNTER_ID, ATTR_VALUE
+
+_LOGGER = logging.getLogger(__name__)
+
+MAX_VALUE: Final = 999999
+
+STATUS_OK: Final = "ok"
+STATUS_INVALID: Final = "invalid"
+STATUS_NOT_UPDATED: Final = "not_updated"
+STATUS_ERROR: Final = "error"
+
+REPORT_FIELDS: Final = [
+    CONF_ORG_ID,
+    CONF_ACC_ID,
+    ATTR_COUNTER_ID,
+    ATTR_VALUE,
+    "status",
+    "error",
+    "elapsed",
+]
+
+
+class Reading(TypedDict):
+    """Reading to submit"""
+
+    org_id: str
+    acc_id: str
+    counter_id: str
+    value: Any
+
+
+class RateLimiter:
+    """Limit rate of operations to `rate` per second."""
+
+    def __init__(self, rate: float):
+        self._interval = 1 / rate if rate > 0 else 0
+        self._lock = asyncio.Lock()
+        self._next = 0.0
+
+    async def __aenter__(self):
+        if not self._interval:
+            return
+        async with self._lock:
+            loop = asyncio.get_running_loop()
+            delay = self._next - loop.time()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next = loop.time() + self._interval
+
+    async def __aexit__(self, *args):
+        pass
+
+
+def parse_value(value: Any) -> Any:
+    """Convert numeric value to int or float, other values are kept as is."""
+    if isinstance(value, str):
+        try:
+            value = float(value.replace(",", "."))
+        except ValueError:
+            return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    return value
+
+
+def parse_reading(row: dict[str, Any]) -> Reading:
+    """Normalize single input row."""
+    return {
+        CONF_ORG_ID: str(row.get(CONF_ORG_ID) or ""),
+        CONF_ACC_ID: str(row.get(CONF_ACC_ID) or ""),
+        ATTR_COUNTER_ID: str(row.get(ATTR_COUNTER_ID) or ""),
+        ATTR_VALUE: parse_value(row.get(ATTR_VALUE)),
+    }
+
+
+def format_error(err: Exception) -> str:
+    """Return error description for the report."""
+    return f"{type(err).__name__}: {err}" if str(err) else type(err).__name__
+
+
+def make_result(reading: Reading, status: str, error: str = None) -> dict[str, Any]:
+    """Make report record for the reading."""
+    result = {**reading, "status": status}
+    if error:
+        result["error"] = error
+    return result
+
+
+def validate_reading(reading: Reading, counters: dict[str, Any]) -> str | None:
+    """Validate reading against last known counter values.
+
+    Returns error description or None when reading is valid.
+    """
+    counter = counters.get(reading[ATTR_COUNTER_ID])
+    if counter is None:
+        return f"Неизвестный счетчик {reading[ATTR_COUNTER_ID]}"
+    value = reading[ATTR_VALUE]
+    if not isinstance(value, int) or isinstance(value, bool):
+        return f"Неверное значение {value}"
+    last_value = counter[KvartaCApi.COUNTER_VALUE]
+    if value <= last_value:
+        return f"Новое значение {value} не больше предыдущего {last_value}"
+    if value > MAX_VALUE:
+        return f"Новое значение {value} больше {MAX_VALUE}"
+    return None
+
+
+def group_readings(
+    readings: Iterable[Reading],
+) -> dict[tuple[str, str], list[Reading]]:
+    """Group readings by (org_id, acc_id)."""
+    groups: dict[tuple[str, str], list[Reading]] = {}
+    for reading in readings:
+        key = (reading[CONF_ORG_ID], reading[CONF_ACC_ID])
+        groups.setdefault(key, []).append(reading)
+    return groups
+
+
+def validate_readings(
+    readings: list[Reading], counters: dict[str, Any]
+) -> tuple[list[Reading], list[dict[str, Any]]]:
+    """Split account readings to valid ones and report of invalid."""
+    valid: list[Reading] = []
+    invalid: list[dict[str, Any]] = []
+    seen: set[str] = set()
+    for reading in readings:
+        error = validate_reading(reading, counters)
+        if error is None and reading[ATTR_COUNTER_ID] in seen:
+            error = f"Повторное значение для {reading[ATTR_COUNTER_ID]}"
+        if error is None:
+            seen.add(reading[ATTR_COUNTER_ID])
+            valid.append(reading)
+        else:
+            invalid.append(make_result(reading, STATUS_INVALID, error))
+    return valid, invalid
+
+
+async def async_submit_account(
+    api: KvartaCApi,
+    readings: list[Reading],
+    limiter: RateLimiter,
+    fetch_first: bool = False,
+    timeout: float | None = None,
+) -> list[dict[str, Any]]:
+    """Submit all readings of single account with one login.
+
+    Readings are validated against cached `api.counters`, when there is
+    nothing cached yet use `fetch_first` to fetch them before validation.
+    Limiter is applied to every portal request, timeout limits all requests
+    of the account together.
+    """
+    results: list[dict[str, Any]] = []
+    valid = readings
+    api.limiter = limiter
+    try:
+        async with async_timeout.timeout(timeout):
+            if fetch_first:
+                await api.async_fetch()
+
+            valid, results = validate_readings(readings, api.counters)
+            if not valid:
+                return results
+
+            await api.async_update_values(
+                {reading[ATTR_COUNTER_ID]: reading[ATTR_VALUE] for reading in valid}
+            )
+    except Exception as err:  # pylint: disable=broad-except
+        error = format_error(err)
+        return results + [
+            make_result(reading, STATUS_ERROR, error) for reading in valid
+        ]
+
+    for reading in valid:
+        counter = api.counters.get(reading[ATTR_COUNTER_ID], {})
+        if counter.get(KvartaCApi.COUNTER_VALUE) == reading[ATTR_VALUE]:
+            results.append(make_result(reading, STATUS_OK))
+        else:
+            results.append(
+                make_result(
+                    reading,
+                    STATUS_NOT_UPDATED,
+                    f"Текущее значение {counter.get(KvartaCApi.COUNTER_VALUE)}",
+                )
+            )
+    return results
+
+
+async def async_submit_readings(
+    readings: Iterable[Reading],
+    api_context: Callable[
+        [str, str], AsyncContextManager[tuple[KvartaCApi, bool] | None]
+    ],
+    concurrency: int,
+    rate: float,
+    timeout: float | None = None,
+) -> AsyncIterator[list[dict[str, Any]]]:
+    """Submit readings of many accounts concurrently under a rate limit.
+
+    `api_context` provides api for (org_id, acc_id) together with `fetch_first`
+    flag, or None when account is unknown. Yields report of every account as
+    soon as it completes.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate)
+
+    async def _async_submit(key: tuple[str, str], group: list[Reading]):
+        async with semaphore:
+            start = time.perf_counter()
+            async with api_context(*key) as found:
+                if found is None:
+                    error = "Неизвестный лицевой счет"
+                    results = [
+                        make_result(reading, STATUS_INVALID, error)
+                        for reading in group
+                    ]
+                else:
+                    api, fetch_first = found
+                    _LOGGER.debug("Submitting %d readings for %s", len(group), api.uid)
+                    results = await async_submit_account(
+                        api, group, limiter, fetch_first, timeout
+                    )
+            elapsed = round(time.perf_counter() - start, 3)
+            for result in results:
+                result["elapsed"] = elapsed
+            return results
+
+    tasks = [
+        asyncio.create_task(_async_submit(key, group))
+        for key, group in group_readings(readings).items()
+    ]
+    try:
+        for task in asyncio.as_completed(tasks):
+            yield await task
+    finally:
+        for task in tasks:
+            task.cancel()
+
+
+def summarize(results: list[dict[str, Any]]) -> dict[str, Any]:
+    """Return report with per status counters."""
+    summary: dict[str, int] = {}
+    for result in results:
+        summary[result["status"]] = summary.get(result["status"], 0) + 1
+    return {"summary": summary, "results": results}